@@ -1,57 +1,80 @@
 from pathlib import Path
-import time, logging
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+import time, logging, secrets
+from anyio import CapacityLimiter, to_thread
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException
+from fastapi.responses import Response
 
+from app.core.config import settings
 from app.services.transcription import transcrire
 from app.services.notes import meeting_notes, notes_to_markdown
 
 logger = logging.getLogger(__name__) #Log pour debugger
 
+# Limiteur dédié aux appels ML (Whisper, BART) : il borne leur concurrence
+# sans occuper le threadpool global d'anyio, utilisé aussi par Starlette
+# (uploads multipart) et par les tâches de fond (_persist)
+_ML_LIMITER = CapacityLimiter(settings.THREADPOOL_SIZE)
+
 router = APIRouter(
     prefix="/meetings",
     tags=["meetings"],
 )
 
 
-@router.post("/", response_class=FileResponse,
+def _persist(markdown_path: Path, md_bytes: bytes) -> None:
+    """
+    Sauvegarde le rapport sur disque (lancé en tâche de fond après la réponse).
+    """
+    with markdown_path.open("wb") as f:
+        f.write(md_bytes)
+    logger.info("Meeting report saved to %s", markdown_path)
+
+
+@router.post("/", response_class=Response,
     summary="Générer un rapport de réunion à partir d'un fichier audio",
 )
 
-def gen_meeting_report(file: UploadFile = File(...)) -> FileResponse:
+async def gen_meeting_report(
+    background_tasks: BackgroundTasks, file: UploadFile = File(...)
+) -> Response:
     """
     Reçoit un fichier audio et renvoie un rapport de réunion Markdown.
     - transcription avec un modele asr (ici whisper)
     - génération du résumé et de notes (sujets, décisions, actions)
-    - Markdown téléchargé dans 'downloads' et sauvé sur disque
+    - Markdown renvoyé directement, puis sauvé dans REPORTS_DIR en tâche de fond
+
+    Les appels bloquants (Whisper, BART) tournent dans des threads, bornés
+    par _ML_LIMITER, pour ne pas bloquer la boucle d'évènements.
     """
     
     if not file.filename: 
         raise HTTPException(status_code=400, detail="Aucun fichier audio fourni")
 
     #En plus de la transcription, on relève sa longueur et la langue detectée
-    transcript, lang = transcrire(file)
+    transcript, lang = await to_thread.run_sync(transcrire, file, limiter=_ML_LIMITER)
     logger.info("Transcription done (lang=%s, length=%d chars)", lang, len(transcript)) 
 
     # Resumé et Notes
-    notes = meeting_notes(transcript)
+    notes = await to_thread.run_sync(
+        meeting_notes, transcript, limiter=_ML_LIMITER
+    )
     logger.info("Meeting notes generated")
     
     markdown = notes_to_markdown(notes, lang=lang)
     logger.info("Markdown report generated")
     
-    output_dir = Path("downloads")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    # Dossier créé une fois au démarrage (lifespan) ; suffixe aléatoire pour
+    # éviter les collisions entre requêtes arrivées dans la même seconde
     timestamp = int(time.time())
-    markdown_path = output_dir / f"rapport_reunion_{timestamp}.md" #Nom unique à chaque reunion
+    name = f"rapport_reunion_{timestamp}_{secrets.token_hex(4)}.md" #Nom unique à chaque reunion
+    markdown_path = Path(settings.REPORTS_DIR) / name
 
-    with markdown_path.open("w", encoding="utf-8") as f:
-        f.write(markdown) 
-    logger.info("Meeting report saved to %s", markdown_path)
+    # Le client reçoit le rapport sans attendre l'écriture sur disque
+    md_bytes = markdown.encode("utf-8")
+    background_tasks.add_task(_persist, markdown_path, md_bytes)
 
-    
-    return FileResponse(
-        path=markdown_path,
-        filename=markdown_path.name,      # on garde le meme nom
-        media_type="text/markdown",
+    return Response(
+        content=md_bytes,
+        media_type="text/markdown; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{markdown_path.name}"'},
     )
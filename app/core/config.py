@@ -75,6 +75,36 @@ class Settings(BaseSettings):
             return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}-test"
         return f"{self.DB_ENGINE}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}-test"
 
+    # Report generator
+    # Directory where generated markdown reports are saved
+    REPORTS_DIR: str = os.getenv("REPORTS_DIR", "downloads")
+    # faster-whisper model: "base" (fastest), "small", "large-v3-turbo"
+    # (multilingual, pruned decoder). "distil-large-v3" is English-only:
+    # do not use it for French meetings.
+    WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "small")
+    # CTranslate2 compute type; empty = int8_float16 on GPU, int8 on CPU
+    WHISPER_COMPUTE: str = os.getenv("WHISPER_COMPUTE", "")
+    # 30 s audio windows decoded per batch; 0 or 1 = sequential decoding
+    WHISPER_BATCH_SIZE: int = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+    # Load and warm up the ASR / summarization models at startup
+    WARMUP_MODELS: bool = os.getenv("WARMUP_MODELS", "true").lower() == "true"
+    # Entries kept in the transcription / meeting notes LRU caches
+    REPORT_CACHE_SIZE: int = int(os.getenv("REPORT_CACHE_SIZE", "64"))
+    # Uvicorn worker processes; 0 = auto (1 on GPU, 4 on CPU), see
+    # app/core/workers.py
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    # Concurrent ASR / summarization calls (dedicated limiter; anyio's
+    # global threadpool of 40 threads is left untouched)
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", "16"))
+    # "sshleifer/distilbart-cnn-12-6" is a distilled, ~2x faster alternative
+    SUMMARIZATION_MODEL: str = os.getenv(
+        "SUMMARIZATION_MODEL", "philschmid/bart-large-cnn-samsum"
+    )
+    # torch.compile the summarizer (GPU only, opt-in: not benchmarked yet)
+    SUMMARIZATION_COMPILE: bool = (
+        os.getenv("SUMMARIZATION_COMPILE", "false").lower() == "true"
+    )
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
@@ -0,0 +1,58 @@
+"""
+Worker process sizing.
+
+Every uvicorn worker loads its own Whisper + summarization models, so the
+worker count depends on the device and each worker gets its share of the
+CPU cores.
+"""
+
+import logging
+import os
+
+import torch
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Default worker count on CPU-only hosts
+CPU_WORKERS = 4
+
+
+def resolve_workers() -> int:
+    """
+    Number of uvicorn workers to start.
+
+    WEB_CONCURRENCY=0 (default) picks 1 worker on GPU and CPU_WORKERS on CPU.
+    More than one worker on GPU would load a copy of every model in VRAM
+    per worker, so it is refused and forced down to 1.
+    """
+    workers = settings.WEB_CONCURRENCY
+    if torch.cuda.is_available():
+        if workers > 1:
+            logger.warning(
+                "WEB_CONCURRENCY=%d ignored on GPU: each worker loads its own "
+                "models in VRAM, starting 1 worker",
+                workers,
+            )
+        return 1
+    if workers <= 0:
+        return min(CPU_WORKERS, os.cpu_count() or 1)
+    return workers
+
+
+def cpu_threads_per_worker() -> int:
+    """
+    CPU threads for torch / CTranslate2 in this worker: the cores split
+    evenly between workers, so N workers do not oversubscribe the CPU.
+
+    start.sh and main.py export the resolved WEB_CONCURRENCY before starting
+    uvicorn; when it is unset uvicorn runs a single worker.
+    """
+    workers = 1 if torch.cuda.is_available() else max(1, settings.WEB_CONCURRENCY)
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+if __name__ == "__main__":
+    # Used by start.sh to size the uvicorn --workers option
+    print(resolve_workers())
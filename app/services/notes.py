@@ -1,12 +1,33 @@
 from __future__ import annotations
-import logging, re
-from dataclasses import dataclass
+import hashlib, logging, re, threading, torch
+from dataclasses import dataclass, replace
 from functools import lru_cache
 from typing import List, Tuple
-from transformers import pipeline
+from packaging import version
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+from app.core.config import settings
+from app.core.workers import cpu_threads_per_worker
+from app.utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Regex compilées une seule fois (découpage en phrases et mots-clés FR / EN)
+# Listes à compléter avec d'autres keywords si besoin
+_SPLIT = re.compile(r"(?<=[\.\!\?])\s+")
+_DEC_RE = re.compile(r"décidé|décision|convenu|agreed|will decide", re.IGNORECASE)
+_ACT_RE = re.compile(r"à faire|\bfaire\b|action|follow|implement|to do", re.IGNORECASE)
+
+# Paramètres de génération du résumé (partagés avec le warmup)
+_GEN_KWARGS = dict(
+    max_length=150,
+    min_length=80, # 60
+    do_sample=False, #déterministe
+    num_beams=1, # greedy, le beam search domine le coût de génération
+    truncation=True,
+)
+_BATCH_SIZE = 8  # segments résumés par appel batché
+
 
 @dataclass
 class MeetingNotes:
@@ -20,17 +41,83 @@ class MeetingNotes:
     actions: List[str]
 
 
+# Cache des notes indexé par le hash de la transcription (BART est déterministe)
+_NOTES_CACHE: LRUCache[MeetingNotes] = LRUCache(settings.REPORT_CACHE_SIZE)
+_NOTES_CACHE_LOCK = threading.Lock()
+
+
+def _copy_notes(notes: MeetingNotes) -> MeetingNotes:
+    """
+    Copie des notes (listes comprises) : le cache ne partage jamais ses
+    objets avec les appelants.
+    """
+    return replace(notes, decisions=list(notes.decisions), actions=list(notes.actions))
+
+
+def _compile_enabled() -> bool:
+    """
+    torch.compile uniquement sur demande (SUMMARIZATION_COMPILE), sur GPU
+    et avec torch >= 2.1.
+    """
+    return (
+        settings.SUMMARIZATION_COMPILE
+        and torch.cuda.is_available()
+        and version.parse(torch.__version__) >= version.parse("2.1")
+    )
+
+
 @lru_cache()
 def charge_model():
     """
     Charge le modèle de résumé une seule fois. 
-    Modèle entraîné sur des dialogues (SAMSum).
+    Par défaut modèle entraîné sur des dialogues (SAMSum), en FP16 sur GPU
+    et BF16 sur CPU.
+    """
+    name = settings.SUMMARIZATION_MODEL
+    cuda = torch.cuda.is_available()
+    device = torch.device("cuda:0" if cuda else "cpu")
+    dtype = torch.float16 if cuda else torch.bfloat16
+    logger.info("Load summarization model: %s (device=%s, dtype=%s)", name, device, dtype)
+
+    # Part des cœurs de ce worker pour le pool intra-op de torch
+    torch.set_num_threads(cpu_threads_per_worker())
+
+    tok = AutoTokenizer.from_pretrained(name)
+    mdl = AutoModelForSeq2SeqLM.from_pretrained(name, torch_dtype=dtype).to(device)
+
+    if _compile_enabled():
+        logger.info("Compile summarization model with torch.compile")
+        # On compile forward (appelé par generate) pour garder l'objet
+        # PreTrainedModel attendu par le pipeline. BART n'a pas de cache KV
+        # statique : les shapes changent à chaque pas de décodage, avec la
+        # taille du lot et la longueur d'entrée. dynamic=True évite une
+        # recompilation par shape, et le mode "default" n'enregistre pas de
+        # CUDA graph par shape (contrairement à "reduce-overhead").
+        mdl.forward = torch.compile(mdl.forward, mode="default", dynamic=True)
+
+    return pipeline("summarization", model=mdl, tokenizer=tok, device=device)
+
+
+def warmup_model() -> None:
+    """
+    Charge le modèle de résumé et lance une génération courte (warmup).
+    Si le modèle est compilé, on lance aussi un lot représentatif des
+    requêtes (taille de lot, longueur d'entrée et de sortie) pour que la
+    compilation soit faite au démarrage et non à la première requête.
     """
-    logger.info("Load summarization model: philschmid/bart-large-cnn-samsum")
-    return pipeline("summarization", model="philschmid/bart-large-cnn-samsum")
+    model = charge_model()
+    # Mêmes paramètres de génération que les requêtes (greedy, truncation),
+    # en version courte
+    model("warmup sentence", **{**_GEN_KWARGS, "max_length": 16, "min_length": 1})
 
+    if _compile_enabled():
+        # ~1000 tokens par segment, comme les segments de gen_resume
+        segments = [" ".join(["warmup sentence."] * 250)] * _BATCH_SIZE
+        model(segments, batch_size=_BATCH_SIZE, **_GEN_KWARGS)
+    logger.info("Summarization model warmed up")
 
-def gen_resume(transcript: str, max_size: int = 2000) -> str:
+
+def gen_resume(transcript: str, max_tokens: int = 1000) -> str:
     """
     Génère un résumé à partir d'une transcription decoupée en plusieurs segments
     """
@@ -39,145 +126,156 @@ def gen_resume(transcript: str, max_size: int = 2000) -> str:
 
     model_asr = charge_model()
 
-    #Les segments sont des morceaux du transcript de taille max_size 
-    # car le modèle ne traite pas (correctement) les longs textes
+    #Les segments sont des morceaux du transcript de max_tokens tokens
+    # car le modèle est limité à 1024 tokens en entrée (marge pour les
+    # tokens spéciaux) : découper en tokens plutôt qu'en caractères donne
+    # moins de segments, donc moins d'appels à generate()
+    tok = model_asr.tokenizer
+    ids = tok.encode(transcript, add_special_tokens=False)
     segments = [
-        transcript[i : i + max_size]
-        for i in range(0, len(transcript), max_size)
+        tok.decode(ids[i : i + max_tokens])
+        for i in range(0, len(ids), max_tokens)
     ]
 
-    list_resumes: List[str] = [] # Résumés partiels pour chaque segment
-    for seg in segments:
-        try:
-            res = model_asr(
-                seg,
-                max_length=250, # Reduire à 150 pour tests rapides
-                min_length=80, # 60
-                do_sample=False, #déterministe
-            )
-            list_resumes.append(res[0]["summary_text"])
-        except Exception as e:
-            logger.exception("Error segment summary: %s", e)            
-            continue
+    # Un seul appel batché au lieu d'une boucle segment par segment
+    try:
+        results = model_asr(
+            segments, batch_size=min(len(segments), _BATCH_SIZE), **_GEN_KWARGS
+        )
+        list_resumes: List[str] = [r["summary_text"] for r in results]
+    except Exception as e:
+        # Typiquement un OOM : on repasse segment par segment
+        logger.warning("Batched summary failed (%s), falling back to per-segment", e)
+        list_resumes = [] # Résumés partiels pour chaque segment
+        for seg in segments:
+            try:
+                res = model_asr(seg, **_GEN_KWARGS)
+                list_resumes.append(res[0]["summary_text"])
+            except Exception as seg_err:
+                logger.exception("Error segment summary: %s", seg_err)
+                continue
 
     return " ".join(list_resumes).strip() # On retourne l'ensemble des résumés comme un seul
 
 
-def gen_topics(summary: str) -> str:
+def _split_sentences(summary: str) -> List[str]:
     """
-    Extrait une ou deux phrases qui résument les sujets abordés à partir du résumé.
+    Découpe le résumé en phrases (une seule fois pour tout le pipeline).
     """
-    phrases = [
-        s.strip() for s in re.split(r"(?<=[\.\!\?])\s+", summary) if s.strip()
-    ]
-    if not phrases:
-        return summary.strip()
+    return [s.strip() for s in _SPLIT.split(summary) if s.strip()]
 
-    # On prend les 1 à 2 premières phrases comme 'topics'
-    topic = " ".join(phrases[:2])
-    return topic
 
+def _topics_from(sentences: List[str]) -> str:
+    """
+    On prend les 1 à 2 premières phrases comme 'topics'
+    """
+    return " ".join(sentences[:2])
 
-def decisions_actions(summary: str) -> Tuple[List[str], List[str]]:
+
+def _decisions_actions_from(sentences: List[str]) -> Tuple[List[str], List[str]]:
     """
-    Parcourt le resumé pour identifier décisions et actions
-    à partir de mots-clés FR ou EN. 
+    Classe les phrases en décisions / actions à partir de mots-clés FR ou EN.
     """
     decisions: List[str] = []
     actions: List[str] = []
 
-    phrases = [
-        s.strip() for s in re.split(r"(?<=[\.\!\?])\s+", summary) if s.strip()
-    ]
-
-    # Listes à compléter avec d'autres keywords si besoin
-    decision_keywords = ["décidé", "décision", "convenu", "agreed", "will decide"]
-    action_keywords = ["à faire", "faire", "action", "follow", "implement", "to do"]
-
-    for s in phrases:
-        low = s.lower() #Case-insensitive
-        if any(kw in low for kw in decision_keywords):
+    for s in sentences:
+        if _DEC_RE.search(s): #Case-insensitive
             decisions.append(s)
-        elif any(kw in low for kw in action_keywords):
+        elif _ACT_RE.search(s):
             actions.append(s)
 
     return decisions, actions
 
 
+def gen_topics(summary: str) -> str:
+    """
+    Extrait une ou deux phrases qui résument les sujets abordés à partir du résumé.
+    """
+    return _topics_from(_split_sentences(summary))
+
+
+def decisions_actions(summary: str) -> Tuple[List[str], List[str]]:
+    """
+    Parcourt le resumé pour identifier décisions et actions
+    à partir de mots-clés FR ou EN. 
+    """
+    return _decisions_actions_from(_split_sentences(summary))
+
+
 def meeting_notes(transcript: str) -> MeetingNotes:
     """
     Pipeline :
     - résumé
     - extraction des sujets
     - extraction décisions / actions
+    Les résultats sont mis en cache par transcription.
     """
-    
+    key = hashlib.blake2b(transcript.encode("utf-8"), digest_size=16).hexdigest()
+    with _NOTES_CACHE_LOCK:
+        cached = _NOTES_CACHE.get(key)
+    if cached is not None:
+        logger.info("Meeting notes cache hit (%s)", key)
+        return _copy_notes(cached)
+
     summary = gen_resume(transcript)
     logger.info("Summary generated")
     
-    topics = gen_topics(summary)
+    # Découpage en phrases partagé par les deux extractions
+    sentences = _split_sentences(summary)
+
+    topics = _topics_from(sentences)
     logger.info("Topics: %s", topics)
     
-    decisions, actions = decisions_actions(summary)
+    decisions, actions = _decisions_actions_from(sentences)
     logger.info(" %d decisions; %d actions", len(decisions), len(actions))
 
-    return MeetingNotes(
+    notes = MeetingNotes(
         transcript=transcript,
         summary=summary,
         topics=topics,
         decisions=decisions,
         actions=actions,
     )
+    with _NOTES_CACHE_LOCK:
+        _NOTES_CACHE.put(key, _copy_notes(notes))
+
+    return notes
 
 
 def notes_to_markdown(notes: MeetingNotes, lang: str) -> str:
     """
     Génère un rapport Markdown à partir des notes
     """
+    if lang.startswith("fr"): #On verifie la langue
+        titles = (
+            "# Compte-rendu de réunion\n\n## Sujets abordés\n",
+            "\n\n## Décisions\n",
+            "\n\n## Actions\n",
+            "\n\n## Résumé\n",
+            "\n\n## Transcription complète\n",
+        )
+    else:
+        titles = (
+            "# Meeting Report\n\n## Topics Discussed\n",
+            "\n\n## Decisions\n",
+            "\n\n## Action Items\n",
+            "\n\n## Summary\n",
+            "\n\n## Full Transcript\n",
+        )
+
+    # Un seul "".join : la transcription (potentiellement très longue)
+    # n'est copiée qu'une fois
+    parts: List[str] = [titles[0], notes.topics, titles[1]]
     if notes.decisions:
-        decisions_block = "- " + "\n- ".join(notes.decisions)
+        parts += ["- ", "\n- ".join(notes.decisions)]
     else:
-        decisions_block = "NA"
-
+        parts.append("NA")
+    parts.append(titles[2])
     if notes.actions:
-        actions_block = "- " + "\n- ".join(notes.actions)
-    else:
-        actions_block = "NA"
-
-    if lang.startswith("fr"): #On verifie la langue
-        md = f"""# Compte-rendu de réunion
-
-## Sujets abordés
-{notes.topics}
-
-## Décisions
-{decisions_block}
-
-## Actions
-{actions_block}
-
-## Résumé
-{notes.summary}
-
-## Transcription complète
-{notes.transcript}
-"""
+        parts += ["- ", "\n- ".join(notes.actions)]
     else:
-        md = f"""# Meeting Report
-
-## Topics Discussed
-{notes.topics}
-
-## Decisions
-{decisions_block}
-
-## Action Items
-{actions_block}
-
-## Summary
-{notes.summary}
+        parts.append("NA")
+    parts += [titles[3], notes.summary, titles[4], notes.transcript, "\n"]
 
-## Full Transcript
-{notes.transcript}
-"""
-    return md
+    return "".join(parts)
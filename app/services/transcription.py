@@ -1,70 +1,140 @@
 from __future__ import annotations
-import logging, whisper
+import hashlib, logging, threading, torch
+import numpy as np
 from functools import lru_cache
-from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Tuple, Optional
+from typing import Tuple, Optional, cast
 from fastapi import UploadFile, HTTPException
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+
+from app.core.config import settings
+from app.core.workers import cpu_threads_per_worker
+from app.utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
-MODEL_NAME = "base"  # "base" test rapides, "small" un peu plus lent mais plus précis
+SAMPLE_RATE = 16000  # fréquence attendue par Whisper
+CHUNK_SIZE = 1024 * 1024  # lecture de l'upload par blocs de 1 Mio
+
+# Cache des transcriptions indexé par le hash du contenu audio
+_ASR_CACHE: LRUCache[Tuple[str, str]] = LRUCache(settings.REPORT_CACHE_SIZE)
+_ASR_CACHE_LOCK = threading.Lock()
 
 
 @lru_cache()
-def charge_asr() -> whisper.Whisper:
+def charge_asr() -> WhisperModel:
     """
-    Charge le modèle (ici Whisper) une seule fois et le met en cache.
+    Charge le modèle (ici Whisper via faster-whisper / CTranslate2) une seule fois
+    et le met en cache. Modèle et quantification viennent de la config
+    (par défaut int8 sur CPU, int8_float16 sur GPU).
     """
-    logger.info("ASR model: %s", MODEL_NAME)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    compute_type = settings.WHISPER_COMPUTE or (
+        "int8_float16" if device == "cuda" else "int8"
+    )
+    model_name = settings.WHISPER_MODEL
+    logger.info("ASR model: %s (device=%s, compute_type=%s)", model_name, device, compute_type)
     try:
-        model = whisper.load_model(MODEL_NAME)
+        model = WhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads_per_worker(),  # part des cœurs de ce worker
+        )
     except Exception as e:
         logger.exception("Failed to load transcription model")
         raise RuntimeError("Impossible de charger le modèle de transcription") from e
     return model
 
 
-def save_upload_temp(upload_file: UploadFile) -> Path:
+@lru_cache()
+def charge_batched_asr() -> BatchedInferencePipeline:
     """
-    Sauvegarde un UploadFile FastAPI dans un fichier temporaire et
-    renvoie son chemin.
+    Pipeline batché au-dessus du même modèle : l'audio est découpé en fenêtres
+    de ~30 s (via le VAD) décodées par lots de WHISPER_BATCH_SIZE.
     """
-    suffix = Path(upload_file.filename or "").suffix or ".tmp"
+    return BatchedInferencePipeline(model=charge_asr())
 
+
+def warmup_asr() -> None:
+    """
+    Warmup sur 1 s de silence pour que la première requête tombe sur des
+    kernels déjà initialisés :
+    - via transcribe_lang (même point d'entrée et options que les requêtes) :
+      charge le VAD Silero, le pipeline batché et lance la détection de langue
+    - puis un décodage sans VAD (le silence ne produit aucun segment voisé
+      à décoder dans le premier appel)
+    """
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    transcribe_lang(silence)
+    segments, _ = charge_asr().transcribe(silence, beam_size=1, vad_filter=False)
+    list(segments)  # consomme le générateur pour lancer le décodage
+    logger.info("ASR model warmed up")
+
+
+def hash_upload(upload_file: UploadFile) -> str:
+    """
+    Calcule l'empreinte BLAKE2b du fichier uploadé (lecture par blocs),
+    puis remet le curseur au début pour le décodage.
+    """
+    h = hashlib.blake2b(digest_size=16)
     try:
-        with NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(upload_file.file.read())
-            tmp_path = Path(tmp.name)
+        for chunk in iter(lambda: upload_file.file.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+        upload_file.file.seek(0)
     except Exception as e:
         logger.exception("Error reading audio file")
         raise HTTPException(status_code=500, detail="Erreur lors de la lecture du fichier audio") from e
 
-    return tmp_path
+    return h.hexdigest()
 
 
-def transcribe_lang(audio_path: Path, language: Optional[str] = None) -> Tuple[str, str]:
+def load_audio(upload_file: UploadFile) -> np.ndarray:
+    """
+    Décode un UploadFile FastAPI directement en mémoire (PyAV, sans fichier
+    temporaire ni sous-processus ffmpeg) et renvoie le signal mono float32
+    rééchantillonné à 16 kHz.
+    """
+    try:
+        audio = cast(np.ndarray, decode_audio(upload_file.file, sampling_rate=SAMPLE_RATE))
+    except Exception as e:
+        logger.exception("Error reading audio file")
+        raise HTTPException(status_code=500, detail="Erreur lors de la lecture du fichier audio") from e
+
+    return audio
+
+
+def transcribe_lang(audio: np.ndarray, language: Optional[str] = None) -> Tuple[str, str]:
     """    
     Lance le modele et retourne:
         transcript: texte 
         detected_language: code ('fr', 'en')
     """
-    model = charge_asr()
+    options = dict(
+        language=language,     # auto-détection par whisper si None
+        temperature=0.0,
+        beam_size=1,
+        vad_filter=True,       # Silero VAD : on ne décode pas les silences
+    )
 
     try:
-        result = model.transcribe(
-            str(audio_path),
-            language=language,     # auto-détection par whisper si None
-            temperature=0.0,
-            beam_size=1,
-            fp16=model.device != "cpu",
-        )
+        if settings.WHISPER_BATCH_SIZE > 1:
+            # Le pipeline batché a ses propres réglages VAD (silences de
+            # 160 ms, fenêtres de 30 s max) : on les garde
+            segments, info = charge_batched_asr().transcribe(
+                audio, batch_size=settings.WHISPER_BATCH_SIZE, **options
+            )
+        else:
+            # Par défaut le VAD séquentiel ne coupe que les silences de 2 s
+            segments, info = charge_asr().transcribe(
+                audio, vad_parameters=dict(min_silence_duration_ms=500), **options
+            )
+        # segments est un générateur : le décodage a lieu pendant l'itération
+        transcript: str = " ".join(s.text.strip() for s in segments).strip()
     except Exception as e:
-        logger.exception("Audio transcription error on %s", audio_path)
+        logger.exception("Audio transcription error")
         raise HTTPException(status_code=500, detail="Erreur transcription audio") from e
 
-    transcript: str = result.get("text", "").strip()
-    detected_language: str = result.get("language", "")
+    detected_language: str = info.language or ""
 
     return transcript, detected_language
 
@@ -73,21 +143,22 @@ def transcrire(file: UploadFile, language: Optional[str] = None) -> Tuple[str, s
     """
     Fonction principale de transcription :
 
-    - Sauvegarde le fichier audio dans un temporaire
+    - Renvoie directement le résultat si le même audio a déjà été transcrit
+    - Décode le fichier audio en mémoire
     - Lance Whisper
     - Renvoie (transcript, langue).
     """
-    audio_path = save_upload_temp(file)
-
-    try:
-        transcript, detected_language = transcribe_lang(audio_path, language=language)
-    finally:
-        # Nettoyage du fichier temporaire
-        try:
-            audio_path.unlink(missing_ok=True)
-        except Exception as e:
-            logger.warning("Unable to delete temp file %s: %s", audio_path, e)
+    key = f"{hash_upload(file)}:{language or ''}"
+    with _ASR_CACHE_LOCK:
+        cached = _ASR_CACHE.get(key)
+    if cached is not None:
+        logger.info("Transcription cache hit (%s)", key)
+        return cached
 
-    return transcript, detected_language
+    audio = load_audio(file)
+    transcript, detected_language = transcribe_lang(audio, language=language)
 
+    with _ASR_CACHE_LOCK:
+        _ASR_CACHE.put(key, (transcript, detected_language))
 
+    return transcript, detected_language
@@ -3,25 +3,24 @@ LRU Cache implementation.
 """
 
 from collections import OrderedDict
-from typing import Any, Dict, Optional, TypeVar, Union, overload
+from typing import Any, Optional, TypeVar, Union, overload
 
 _T = TypeVar("_T")
+_V = TypeVar("_V")
 
 
-class LRUCache(OrderedDict[str, Dict[str, Any]]):
-    """Least Recently Used (LRU) cache."""
+class LRUCache(OrderedDict[str, _V]):
+    """Least Recently Used (LRU) cache, generic over the value type."""
 
     def __init__(self, capacity: int):
         super().__init__()
         self._capacity = capacity
 
     @overload
-    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+    def get(self, key: str) -> Optional[_V]: ...
 
     @overload
-    def get(
-        self, key: str, default: Union[Dict[str, Any], _T]
-    ) -> Union[Dict[str, Any], _T]: ...
+    def get(self, key: str, default: Union[_V, _T]) -> Union[_V, _T]: ...
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get an item and mark it as recently used."""
@@ -30,7 +29,7 @@ class LRUCache(OrderedDict[str, Dict[str, Any]]):
         self.move_to_end(key)
         return self[key]
 
-    def put(self, key: str, value: Dict[str, Any]) -> None:
+    def put(self, key: str, value: _V) -> None:
         self[key] = value
         self.move_to_end(key)
         if len(self) > self._capacity:
@@ -2,7 +2,10 @@
 FastAPI application main entry point.
 """
 
+import os
+
 import uvicorn
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -10,6 +13,9 @@ from app.api.auth import router as auth_router
 from app.api.health import router as health_router
 from app.api.meetings import router as meetings_router
 from app.core.config import settings
+from app.core.workers import resolve_workers
+from app.services.notes import warmup_model
+from app.services.transcription import warmup_asr
 from typing import AsyncGenerator
 from app.db.session import sessionmanager
 from contextlib import asynccontextmanager
@@ -39,6 +45,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     Function that handles startup and shutdown events.
     To understand more, read https://fastapi.tiangolo.com/advanced/events/
     """
+    # Reports directory created once instead of on every request
+    Path(settings.REPORTS_DIR).mkdir(parents=True, exist_ok=True)
+    if settings.WARMUP_MODELS:
+        # Model loading + first inference off the first request's critical path
+        await to_thread.run_sync(warmup_asr)
+        await to_thread.run_sync(warmup_model)
     yield
     if sessionmanager._engine is not None:
         # Close the DB connection
@@ -52,6 +64,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
     docs_url=f"{settings.API_PREFIX}/docs",
     redoc_url=f"{settings.API_PREFIX}/redoc",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -69,4 +82,18 @@ app.include_router(auth_router, prefix="/auth", tags=["authentication"])
 app.include_router(meetings_router, tags=["meetings"])
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Each worker loads its own Whisper + summarization models: 1 worker on
+    # GPU, several on CPU (see app/core/workers.py).
+    # reload is only compatible with a single worker (dev mode).
+    workers = 1 if settings.DEV_MODE else resolve_workers()
+    # Exported so each worker sizes its CPU thread pools accordingly
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=settings.DEV_MODE,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+    )
@@ -3,5 +3,11 @@
 # Run DB migrations
 alembic upgrade head
 
-# Start the application
-uvicorn main:app --host 0.0.0.0 --port 8000
+# Worker count: 1 on GPU, 4 on CPU unless WEB_CONCURRENCY is set
+# (see app/core/workers.py). Exported so each worker sizes its CPU threads.
+WEB_CONCURRENCY="$(python -m app.core.workers)"
+export WEB_CONCURRENCY
+
+# Start the application (one process per worker)
+uvicorn main:app --host 0.0.0.0 --port 8000 \
+    --workers "$WEB_CONCURRENCY" --loop uvloop --http httptools
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+from anyio import CapacityLimiter
+from fastapi import status
+from httpx import AsyncClient
+
+from app.services.notes import MeetingNotes
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Replace the ASR / summarization models and work in a temp directory."""
+    monkeypatch.chdir(tmp_path)
+    # Created by the lifespan handler, which the test client does not run
+    (tmp_path / "downloads").mkdir()
+
+    def fake_transcrire(file: object) -> tuple[str, str]:
+        return "Hello everyone. We agreed to ship on Monday.", "en"
+
+    def fake_meeting_notes(transcript: str) -> MeetingNotes:
+        return MeetingNotes(
+            transcript=transcript,
+            summary="We agreed to ship on Monday.",
+            topics="Release planning.",
+            decisions=["We agreed to ship on Monday."],
+            actions=[],
+        )
+
+    monkeypatch.setattr("app.api.meetings.transcrire", fake_transcrire)
+    monkeypatch.setattr("app.api.meetings.meeting_notes", fake_meeting_notes)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_gen_meeting_report(
+    async_client: AsyncClient, fake_pipeline: Path
+) -> None:
+    response = await async_client.post(
+        "/meetings/", files={"file": ("meeting.wav", b"RIFF", "audio/wav")}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/markdown")
+    assert "attachment" in response.headers["content-disposition"]
+    assert response.text.startswith("# Meeting Report")
+    assert "- We agreed to ship on Monday." in response.text
+
+    # The report is persisted in the background once the response is sent
+    saved = list((fake_pipeline / "downloads").glob("rapport_reunion_*.md"))
+    assert len(saved) == 1
+    assert saved[0].read_text(encoding="utf-8") == response.text
+
+
+@pytest.mark.asyncio
+async def test_gen_meeting_report_unique_filenames(
+    async_client: AsyncClient, fake_pipeline: Path
+) -> None:
+    for _ in range(2):
+        response = await async_client.post(
+            "/meetings/", files={"file": ("meeting.wav", b"RIFF", "audio/wav")}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    saved = list((fake_pipeline / "downloads").glob("rapport_reunion_*.md"))
+    assert len(saved) == 2
+
+
+@pytest.mark.asyncio
+async def test_gen_meeting_report_uses_ml_limiter(
+    async_client: AsyncClient, fake_pipeline: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    limiter = CapacityLimiter(2)
+    borrowed: list[float] = []
+
+    def fake_transcrire(file: object) -> tuple[str, str]:
+        borrowed.append(limiter.borrowed_tokens)
+        return "Hello everyone.", "en"
+
+    monkeypatch.setattr("app.api.meetings._ML_LIMITER", limiter)
+    monkeypatch.setattr("app.api.meetings.transcrire", fake_transcrire)
+
+    response = await async_client.post(
+        "/meetings/", files={"file": ("meeting.wav", b"RIFF", "audio/wav")}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    # The ML call borrowed from the dedicated limiter, not the global pool
+    assert borrowed == [1]
+    assert limiter.borrowed_tokens == 0
@@ -0,0 +1,191 @@
+import pytest
+
+from typing import Any
+
+from app.services.notes import (
+    MeetingNotes,
+    decisions_actions,
+    gen_resume,
+    gen_topics,
+    meeting_notes,
+    notes_to_markdown,
+    warmup_model,
+)
+
+SUMMARY = (
+    "The team reviewed the sprint. They agreed to extend the deadline! "
+    "Paul will follow up with the client? Nothing else was discussed."
+)
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer: one token per word."""
+
+    def __init__(self) -> None:
+        self.vocab: list[str] = []
+
+    def encode(self, text: str, add_special_tokens: bool = True) -> list[int]:
+        ids = []
+        for word in text.split():
+            self.vocab.append(word)
+            ids.append(len(self.vocab) - 1)
+        return ids
+
+    def decode(self, ids: list[int]) -> str:
+        return " ".join(self.vocab[i] for i in ids)
+
+
+class FakeSummarizer:
+    """Summarization pipeline stand-in recording the segments it receives."""
+
+    def __init__(self) -> None:
+        self.tokenizer = FakeTokenizer()
+        self.segments: list[str] = []
+        self.kwargs: list[dict[str, Any]] = []
+
+    def __call__(self, inputs: Any, **kwargs: Any) -> Any:
+        if isinstance(inputs, str):
+            self.segments.append(inputs)
+            self.kwargs.append(kwargs)
+            return [{"summary_text": f"Summary {len(inputs.split())}."}]
+        # A list of strings gives one result dict per item, like the HF pipeline
+        return [self(seg, **kwargs)[0] for seg in inputs]
+
+
+def test_gen_resume_segments_by_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    summarizer = FakeSummarizer()
+    monkeypatch.setattr("app.services.notes.charge_model", lambda: summarizer)
+
+    transcript = " ".join(f"word{i}" for i in range(25))
+    summary = gen_resume(transcript, max_tokens=10)
+
+    assert summary == "Summary 10. Summary 10. Summary 5."
+    assert summarizer.segments[0] == " ".join(f"word{i}" for i in range(10))
+
+
+class OOMSummarizer(FakeSummarizer):
+    """Runs out of memory during the batched call, works segment by segment."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batched_calls = 0
+
+    def __call__(self, inputs: Any, **kwargs: Any) -> Any:
+        if isinstance(inputs, str):
+            return super().__call__(inputs, **kwargs)
+        self.batched_calls += 1
+        # The first segment goes through, then the batch runs out of memory
+        super().__call__(inputs[0], **kwargs)
+        raise RuntimeError("CUDA out of memory")
+
+
+def test_gen_resume_falls_back_per_segment(monkeypatch: pytest.MonkeyPatch) -> None:
+    summarizer = OOMSummarizer()
+    monkeypatch.setattr("app.services.notes.charge_model", lambda: summarizer)
+
+    transcript = " ".join(f"word{i}" for i in range(25))
+    summary = gen_resume(transcript, max_tokens=10)
+
+    # The failed batch is dropped and every segment is retried alone
+    assert summarizer.batched_calls == 1
+    assert summary == "Summary 10. Summary 10. Summary 5."
+    assert summarizer.segments == [
+        " ".join(f"word{i}" for i in range(0, 10)),
+        " ".join(f"word{i}" for i in range(0, 10)),
+        " ".join(f"word{i}" for i in range(10, 20)),
+        " ".join(f"word{i}" for i in range(20, 25)),
+    ]
+
+
+def test_warmup_model_uses_request_generation_kwargs(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    summarizer = FakeSummarizer()
+    monkeypatch.setattr("app.services.notes.charge_model", lambda: summarizer)
+    monkeypatch.setattr("app.services.notes._compile_enabled", lambda: False)
+
+    warmup_model()
+
+    assert summarizer.segments == ["warmup sentence"]
+    assert summarizer.kwargs[0]["num_beams"] == 1
+    assert summarizer.kwargs[0]["truncation"] is True
+    assert summarizer.kwargs[0]["max_length"] == 16
+
+
+def test_warmup_model_runs_representative_batch_when_compiled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    summarizer = FakeSummarizer()
+    monkeypatch.setattr("app.services.notes.charge_model", lambda: summarizer)
+    monkeypatch.setattr("app.services.notes._compile_enabled", lambda: True)
+
+    warmup_model()
+
+    # Short warmup call, then a full batch of request-sized segments
+    assert summarizer.segments[0] == "warmup sentence"
+    assert len(summarizer.segments) == 1 + 8
+    assert all(len(seg.split()) == 500 for seg in summarizer.segments[1:])
+
+
+def test_gen_resume_empty_transcript() -> None:
+    assert gen_resume("  ") == ""
+
+
+def test_gen_topics_first_two_sentences() -> None:
+    assert gen_topics(SUMMARY) == (
+        "The team reviewed the sprint. They agreed to extend the deadline!"
+    )
+
+
+def test_gen_topics_empty_summary() -> None:
+    assert gen_topics("   ") == ""
+
+
+def test_decisions_actions_keywords() -> None:
+    decisions, actions = decisions_actions(SUMMARY)
+    assert decisions == ["They agreed to extend the deadline!"]
+    assert actions == ["Paul will follow up with the client?"]
+
+
+def test_decisions_actions_french_case_insensitive() -> None:
+    decisions, actions = decisions_actions(
+        "Il a été DÉCIDÉ de reporter. Marie doit faire la maquette. Une affaire close."
+    )
+    assert decisions == ["Il a été DÉCIDÉ de reporter."]
+    assert actions == ["Marie doit faire la maquette."]
+
+
+def test_notes_to_markdown_french() -> None:
+    notes = MeetingNotes(
+        transcript="Bonjour à tous.",
+        summary="Résumé.",
+        topics="Sujet.",
+        decisions=["Décision 1", "Décision 2"],
+        actions=[],
+    )
+    md = notes_to_markdown(notes, lang="fr")
+    assert md.startswith("# Compte-rendu de réunion")
+    assert "## Décisions\n- Décision 1\n- Décision 2\n" in md
+    assert "## Actions\nNA\n" in md
+    assert md.endswith("## Transcription complète\nBonjour à tous.\n")
+
+
+def test_meeting_notes_cached_by_transcript(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    def fake_gen_resume(transcript: str) -> str:
+        calls.append(transcript)
+        return SUMMARY
+
+    monkeypatch.setattr("app.services.notes.gen_resume", fake_gen_resume)
+
+    first = meeting_notes("cached meeting transcript")
+    second = meeting_notes("cached meeting transcript")
+
+    assert second == first
+    assert calls == ["cached meeting transcript"]
+    assert first.decisions == ["They agreed to extend the deadline!"]
+
+    # Callers get copies: mutating one result does not leak into the cache
+    second.decisions.append("Mutated by the caller")
+    assert meeting_notes("cached meeting transcript").decisions == first.decisions
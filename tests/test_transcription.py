@@ -0,0 +1,151 @@
+import io
+import wave
+from tempfile import SpooledTemporaryFile
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.services.transcription import (
+    hash_upload,
+    load_audio,
+    transcribe_lang,
+    transcrire,
+    warmup_asr,
+)
+
+
+def make_upload(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="meeting.wav")
+
+
+def make_wav(seconds: float = 1.0, rate: int = 44100, channels: int = 2) -> bytes:
+    """Stereo 16-bit PCM WAV with a 440 Hz tone."""
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (np.sin(2 * np.pi * 440 * t) * 10000).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.repeat(tone, channels).tobytes())
+    return buf.getvalue()
+
+
+def make_spooled_upload(content: bytes, rolled: bool) -> UploadFile:
+    """UploadFile backed by a SpooledTemporaryFile, like Starlette's."""
+    spool = SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(content)
+    if rolled:
+        spool.rollover()  # backed by a real file on disk
+    assert spool._rolled is rolled
+    spool.seek(0)
+    return UploadFile(file=spool, filename="meeting.wav")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("rolled", [False, True])
+def test_load_audio_decodes_to_mono_16k(rolled: bool) -> None:
+    upload = make_spooled_upload(make_wav(), rolled=rolled)
+
+    # Same order as transcrire: hash the upload first, then decode it
+    hash_upload(upload)
+    audio = load_audio(upload)
+
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    assert audio.shape[0] == 16000
+    assert np.abs(audio).max() > 0.1
+
+
+def test_load_audio_invalid_bytes() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        load_audio(make_upload(b"this is not audio"))
+    assert exc_info.value.status_code == 500
+
+
+def test_hash_upload_rewinds_file() -> None:
+    upload = make_upload(b"some audio bytes")
+    digest = hash_upload(upload)
+
+    assert digest == hash_upload(make_upload(b"some audio bytes"))
+    assert digest != hash_upload(make_upload(b"other audio bytes"))
+    assert upload.file.read() == b"some audio bytes"
+
+
+def test_transcrire_cached_by_content(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[int] = []
+
+    def fake_load_audio(upload_file: UploadFile) -> np.ndarray:
+        return np.zeros(16000, dtype=np.float32)
+
+    def fake_transcribe_lang(
+        audio: np.ndarray, language: Optional[str] = None
+    ) -> tuple[str, str]:
+        calls.append(len(audio))
+        return "Bonjour à tous.", "fr"
+
+    monkeypatch.setattr("app.services.transcription.load_audio", fake_load_audio)
+    monkeypatch.setattr(
+        "app.services.transcription.transcribe_lang", fake_transcribe_lang
+    )
+
+    content = b"cached meeting audio"
+    assert transcrire(make_upload(content)) == ("Bonjour à tous.", "fr")
+    assert transcrire(make_upload(content)) == ("Bonjour à tous.", "fr")
+    assert len(calls) == 1
+
+
+def test_warmup_asr_uses_request_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    warmed: list[int] = []
+
+    class FakeModel:
+        def transcribe(self, audio: np.ndarray, **kwargs: object) -> tuple:
+            return iter([]), None
+
+    def fake_transcribe_lang(
+        audio: np.ndarray, language: Optional[str] = None
+    ) -> tuple[str, str]:
+        warmed.append(len(audio))
+        return "", "en"
+
+    monkeypatch.setattr(
+        "app.services.transcription.transcribe_lang", fake_transcribe_lang
+    )
+    monkeypatch.setattr("app.services.transcription.charge_asr", lambda: FakeModel())
+
+    warmup_asr()
+
+    assert warmed == [16000]
+
+
+class RecordingASR:
+    """Records the keyword arguments of transcribe()."""
+
+    def __init__(self) -> None:
+        self.kwargs: dict[str, object] = {}
+
+    def transcribe(self, audio: np.ndarray, **kwargs: object) -> tuple:
+        self.kwargs = kwargs
+        return iter([]), SimpleNamespace(language="fr")
+
+
+@pytest.mark.parametrize("batch_size", [8, 1])
+def test_transcribe_lang_vad_options(
+    monkeypatch: pytest.MonkeyPatch, batch_size: int
+) -> None:
+    asr = RecordingASR()
+    monkeypatch.setattr(settings, "WHISPER_BATCH_SIZE", batch_size)
+    monkeypatch.setattr("app.services.transcription.charge_asr", lambda: asr)
+    monkeypatch.setattr("app.services.transcription.charge_batched_asr", lambda: asr)
+
+    assert transcribe_lang(np.zeros(16000, dtype=np.float32)) == ("", "fr")
+    assert asr.kwargs["vad_filter"] is True
+    if batch_size > 1:
+        # The batched pipeline keeps its own (shorter) VAD silence default
+        assert asr.kwargs["batch_size"] == batch_size
+        assert "vad_parameters" not in asr.kwargs
+    else:
+        assert asr.kwargs["vad_parameters"] == {"min_silence_duration_ms": 500}
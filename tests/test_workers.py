@@ -0,0 +1,52 @@
+import pytest
+
+from app.core.config import settings
+from app.core.workers import cpu_threads_per_worker, resolve_workers
+
+
+@pytest.fixture
+def cpu_host(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("torch.cuda.is_available", lambda: False)
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+
+
+@pytest.fixture
+def gpu_host(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("torch.cuda.is_available", lambda: True)
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+
+
+def test_resolve_workers_auto_on_cpu(
+    cpu_host: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+    assert resolve_workers() == 4
+
+
+def test_resolve_workers_explicit_on_cpu(
+    cpu_host: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 6)
+    assert resolve_workers() == 6
+
+
+def test_resolve_workers_single_worker_on_gpu(
+    gpu_host: None, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+    assert resolve_workers() == 1
+
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert resolve_workers() == 1
+    assert "ignored on GPU" in caplog.text
+
+
+def test_cpu_threads_split_between_workers(
+    cpu_host: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert cpu_threads_per_worker() == 2
+
+    # Unset: uvicorn runs a single worker, which gets every core
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+    assert cpu_threads_per_worker() == 8